@@ -2,12 +2,12 @@
 """
 Add missing stocks to database and fetch their data
 """
-import sqlite3
 import yfinance as yf
-import pandas as pd
 from datetime import datetime, timedelta
-import string
-import random
+import secrets
+import time
+from db_utils import generate_price_data_ids, open_db
+from yf_utils import history_to_prices
 
 # Stocks to add
 MISSING_STOCKS = [
@@ -15,36 +15,31 @@ MISSING_STOCKS = [
     {'symbol': 'SPY', 'name': 'SPDR S&P 500 ETF Trust'}
 ]
 
+# Creation timestamp (ms) shared by every row this run writes; time_ns skips
+# building a datetime object
+START_TS_MS = time.time_ns() // 1_000_000
+
 def generate_asset_id():
     """Generate a CUID-like ID for asset"""
-    timestamp = int(datetime.now().timestamp() * 1000)
-    random_part = ''.join(random.choices(string.ascii_lowercase + string.digits, k=10))
-    return f"cmfuz{random_part}{timestamp}"
-
-def generate_price_data_id():
-    """Generate a CUID-like ID for price data"""
-    timestamp = int(datetime.now().timestamp() * 1000)
-    random_part = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
-    return f"cmfpd{random_part}{timestamp}"
+    return f"cmfuz{secrets.token_hex(5)}{START_TS_MS}"
 
 def add_stock_to_database(cursor, symbol, name):
     """Add a stock to the database"""
 
-    # Check if stock already exists
-    cursor.execute("SELECT id FROM Asset WHERE symbol = ?", (symbol,))
-    if cursor.fetchone():
-        print(f"  {symbol} already exists in database")
-        return cursor.execute("SELECT id FROM Asset WHERE symbol = ?", (symbol,)).fetchone()[0]
-
     # Generate asset ID
     asset_id = generate_asset_id()
-    timestamp = int(datetime.now().timestamp() * 1000)
 
-    # Insert new asset
+    # Insert new asset; the unique symbol index turns this into a no-op for
+    # existing stocks, in which case RETURNING yields no row
     cursor.execute("""
-        INSERT INTO Asset (id, symbol, name, type, exchange, createdAt, updatedAt)
+        INSERT OR IGNORE INTO Asset (id, symbol, name, type, exchange, createdAt, updatedAt)
         VALUES (?, ?, ?, 'STOCK', 'NASDAQ', ?, ?)
-    """, (asset_id, symbol, name, timestamp, timestamp))
+        RETURNING id
+    """, (asset_id, symbol, name, START_TS_MS, START_TS_MS))
+
+    if cursor.fetchone() is None:
+        print(f"  {symbol} already exists in database")
+        return cursor.execute("SELECT id FROM Asset WHERE symbol = ?", (symbol,)).fetchone()[0]
 
     print(f"  Added {symbol} ({name}) to database")
     return asset_id
@@ -68,33 +63,26 @@ def fetch_and_store_data(cursor, asset_id, symbol):
 
         print(f"    Found {len(hist)} days of data")
 
-        # Insert data
-        timestamp = int(datetime.now().timestamp() * 1000)
-        inserted = 0
-
-        for date, row in hist.iterrows():
-            # Skip if any critical values are NaN
-            if pd.isna(row['Open']) or pd.isna(row['Close']) or pd.isna(row['High']) or pd.isna(row['Low']):
-                continue
-
-            try:
-                cursor.execute("""
-                    INSERT INTO PriceData (id, assetId, date, open, high, low, close, volume, createdAt)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    generate_price_data_id(),
-                    asset_id,
-                    date.strftime('%Y-%m-%d %H:%M:%S'),
-                    float(row['Open']),
-                    float(row['High']),
-                    float(row['Low']),
-                    float(row['Close']),
-                    int(row['Volume']) if not pd.isna(row['Volume']) else 0,
-                    timestamp
-                ))
-                inserted += 1
-            except Exception as e:
-                print(f"    ERROR inserting data point: {str(e)}")
+        prices = history_to_prices(hist)
+        ids = generate_price_data_ids(len(prices), START_TS_MS)
+
+        rows = [
+            (price_id, asset_id, date, open_, high, low, close, volume, START_TS_MS)
+            for price_id, (date, open_, high, low, close, volume) in zip(ids, prices)
+        ]
+
+        # main() commits once per stock, so the whole batch is one transaction
+        cursor.executemany("""
+            INSERT INTO PriceData (id, assetId, date, open, high, low, close, volume, createdAt)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(assetId, date) DO UPDATE SET
+                open = excluded.open,
+                high = excluded.high,
+                low = excluded.low,
+                close = excluded.close,
+                volume = excluded.volume
+        """, rows)
+        inserted = len(rows)
 
         print(f"    Inserted {inserted} data points")
         return inserted
@@ -108,7 +96,8 @@ def main():
     print(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
     try:
-        conn = sqlite3.connect('prisma/dev.db', timeout=30.0)
+        # Autocommit mode; each stock is wrapped in an explicit transaction below
+        conn = open_db('prisma/dev.db', isolation_level=None)
         cursor = conn.cursor()
 
         total_inserted = 0
@@ -119,6 +108,8 @@ def main():
 
             print(f"\nProcessing {symbol}...")
 
+            cursor.execute("BEGIN")
+
             # Add stock to database
             asset_id = add_stock_to_database(cursor, symbol, name)
 
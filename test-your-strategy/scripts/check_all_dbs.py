@@ -10,7 +10,8 @@ def check_database(db_path):
     print(f"\n=== Checking database: {db_path} ===")
 
     try:
-        conn = sqlite3.connect(db_path)
+        # Read-only, so the check never blocks a running import
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
         cursor = conn.cursor()
 
         # Get all table names
@@ -18,17 +19,24 @@ def check_database(db_path):
         tables = cursor.fetchall()
 
         print(f"Tables found: {len(tables)}")
-        for table in tables:
-            table_name = table[0]
-            print(f"  - {table_name}")
 
-            # Get count of records in each table
+        # Count records in every table with a single query; names come from
+        # sqlite_master, quoted as identifiers
+        counts = {}
+        if tables:
             try:
-                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                count = cursor.fetchone()[0]
-                print(f"    Records: {count}")
+                cursor.execute(" UNION ALL ".join(
+                    f"SELECT ?, COUNT(*) FROM \"{table[0]}\"" for table in tables
+                ), [table[0] for table in tables])
+                counts = dict(cursor.fetchall())
             except Exception as e:
-                print(f"    Error counting records: {e}")
+                print(f"  Error counting records: {e}")
+
+        for table in tables:
+            table_name = table[0]
+            print(f"  - {table_name}")
+            if table_name in counts:
+                print(f"    Records: {counts[table_name]}")
 
         # If we have Asset table, show some sample data
         if any('Asset' in table[0] for table in tables):
@@ -5,24 +5,29 @@ def check_schema():
     conn = sqlite3.connect('dev.db')
     cursor = conn.cursor()
 
-    # Get all table names
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
+    # Get every table with its columns in one pass via the pragma_table_info
+    # table-valued function (SQLite 3.16+)
+    cursor.execute("""
+        SELECT m.name, p.name, p.type
+        FROM sqlite_master m, pragma_table_info(m.name) p
+        WHERE m.type = 'table'
+        ORDER BY m.rowid, p.cid
+    """)
+    schema = {}
+    for table_name, column_name, column_type in cursor.fetchall():
+        schema.setdefault(table_name, []).append((column_name, column_type))
 
     print("Tables in database:")
-    for table in tables:
-        print(f"  - {table[0]}")
+    for table_name in schema:
+        print(f"  - {table_name}")
 
-    # Get schema for each table
-    for table in tables:
-        table_name = table[0]
-        cursor.execute(f"PRAGMA table_info({table_name});")
-        columns = cursor.fetchall()
+    # Show schema for each table
+    for table_name, columns in schema.items():
         print(f"\nTable '{table_name}' structure:")
-        for col in columns:
-            print(f"  {col[1]} ({col[2]})")
+        for column_name, column_type in columns:
+            print(f"  {column_name} ({column_type})")
 
     conn.close()
 
 if __name__ == "__main__":
-    check_schema()
\ No newline at end of file
+    check_schema()
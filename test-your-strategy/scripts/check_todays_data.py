@@ -5,19 +5,23 @@ Check today's data in database
 import sqlite3
 from datetime import datetime
 
+SYMBOLS = ['AAPL', 'MSFT', 'GOOGL', 'TSLA', 'SPY']
+
 def check_todays_data():
     conn = sqlite3.connect('prisma/dev.db')
     cursor = conn.cursor()
+    placeholders = ', '.join('?' * len(SYMBOLS))
 
-    # Check for today's data
-    cursor.execute("""
+    # Check for today's data; a plain date range (instead of LIKE) lets SQLite
+    # seek the (assetId, date) unique index
+    cursor.execute(f"""
         SELECT a.symbol, p.date, p.close
         FROM Asset a
         JOIN PriceData p ON a.id = p.assetId
-        WHERE a.symbol IN ('AAPL', 'MSFT', 'GOOGL', 'TSLA', 'SPY')
-        AND p.date LIKE '2025-09-22%'
+        WHERE a.symbol IN ({placeholders})
+        AND p.date >= '2025-09-22' AND p.date < '2025-09-23'
         ORDER BY a.symbol
-    """)
+    """, SYMBOLS)
 
     results = cursor.fetchall()
 
@@ -28,21 +32,21 @@ def check_todays_data():
     else:
         print("  No data found for 2025-09-22")
 
-        # Check latest data for each stock
+        # Check latest data for each stock in one query; SQLite returns the
+        # close from the row that holds MAX(date)
         print("\nLatest data for each stock:")
-        for symbol in ['AAPL', 'MSFT', 'GOOGL', 'TSLA', 'SPY']:
-            cursor.execute("""
-                SELECT p.date, p.close
-                FROM Asset a
-                JOIN PriceData p ON a.id = p.assetId
-                WHERE a.symbol = ?
-                ORDER BY p.date DESC
-                LIMIT 1
-            """, (symbol,))
-
-            result = cursor.fetchone()
-            if result:
-                date, close = result
+        cursor.execute(f"""
+            SELECT a.symbol, MAX(p.date), p.close
+            FROM Asset a
+            JOIN PriceData p ON a.id = p.assetId
+            WHERE a.symbol IN ({placeholders})
+            GROUP BY a.symbol
+        """, SYMBOLS)
+        latest = {symbol: (date, close) for symbol, date, close in cursor.fetchall()}
+
+        for symbol in SYMBOLS:
+            if symbol in latest:
+                date, close = latest[symbol]
                 print(f"  {symbol}: {date} - ${close:.2f}")
             else:
                 print(f"  {symbol}: No data found")
@@ -50,4 +54,4 @@ def check_todays_data():
     conn.close()
 
 if __name__ == "__main__":
-    check_todays_data()
\ No newline at end of file
+    check_todays_data()
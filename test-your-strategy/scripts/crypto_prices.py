@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Shared CryptocurrencyPrice storage for the crypto fetch scripts
+"""
+import sqlite3
+from itertools import chain
+from typing import Iterable
+from db_utils import chunked
+
+# Rows per multi-row INSERT; 500 rows x 10 columns stays well under the
+# 32766 host parameter limit of SQLite 3.32+
+INSERT_CHUNK_ROWS = 500
+
+def insert_price_rows(cursor: sqlite3.Cursor, rows: Iterable[tuple]):
+    """Insert price rows with one multi-row INSERT statement per chunk"""
+    # The unique (cryptocurrencyId, date) index is the only secondary index on
+    # CryptocurrencyPrice and the upsert conflicts on it to find existing rows,
+    # so it has to stay in place during bulk loads rather than be rebuilt afterwards
+    for chunk in chunked(rows, INSERT_CHUNK_ROWS):
+        placeholders = ', '.join(['(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'] * len(chunk))
+        # Update existing days in place instead of REPLACE's delete + reinsert
+        cursor.execute(f'''
+            INSERT INTO CryptocurrencyPrice
+            (id, cryptocurrencyId, date, open, high, low, close, volume, marketCap, createdAt)
+            VALUES {placeholders}
+            ON CONFLICT(cryptocurrencyId, date) DO UPDATE SET
+                open = excluded.open,
+                high = excluded.high,
+                low = excluded.low,
+                close = excluded.close,
+                volume = excluded.volume
+        ''', list(chain.from_iterable(chunk)))
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite connection, ID and batching helpers for the data fetch and import scripts
+"""
+import secrets
+import sqlite3
+import time
+from itertools import islice
+
+# Applied to every connection: WAL turns commit fsyncs into log appends, the
+# memory map keeps B-tree pages hot, and busy_timeout waits out other writers
+SQLITE_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "mmap_size=268435456",
+    "busy_timeout=30000",
+)
+
+# Page cache size in KiB (negative) for connections that don't ask for more
+DEFAULT_CACHE_SIZE = -65536
+
+def open_db(path, timeout=30.0, isolation_level="", cached_statements=128, cache_size=DEFAULT_CACHE_SIZE):
+    """Open a SQLite connection with the bulk-write PRAGMAs applied"""
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=isolation_level, cached_statements=cached_statements)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
+    conn.execute(f"PRAGMA cache_size={int(cache_size)}")
+    return conn
+
+def generate_price_data_ids(count, timestamp=None):
+    """Generate CUID-like IDs for a batch of price rows from a random prefix, a ms timestamp and a counter"""
+    if timestamp is None:
+        timestamp = time.time_ns() // 1_000_000
+    prefix = secrets.token_hex(5)
+    return [f"cmfpd{prefix}{timestamp}{i:06d}" for i in range(count)]
+
+def chunked(items, size):
+    """Yield successive lists of at most `size` items"""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -4,7 +4,6 @@ Fetch ALL available cryptocurrency data from yfinance by scraping Yahoo Finance
 This script dynamically discovers all crypto symbols and fetches their daily OHLCV data.
 """
 
-import yfinance as yf
 import sqlite3
 import pandas as pd
 from datetime import datetime, timedelta
@@ -12,16 +11,61 @@ import sys
 import os
 import requests
 import time
-import re
+import lxml.html
 from typing import List, Dict, Optional
+from crypto_prices import insert_price_rows
+from db_utils import generate_price_data_ids, open_db
+from yf_utils import download_in_chunks, download_tickers, history_to_prices
 
 # Database configuration
 DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'prisma', 'dev.db')
 
+# Number of symbols requested from Yahoo Finance in a single download
+DOWNLOAD_CHUNK_SIZE = 20
+
+# Download attempts per chunk before giving up on it
+MAX_DOWNLOAD_RETRIES = 3
+
+# Worker processes downloading chunks in parallel
+DOWNLOAD_WORKERS = 8
+
+# Shared keep-alive session for requests made directly to Yahoo Finance, so
+# repeat requests skip the TCP/TLS handshake. yfinance keeps its own cached
+# session per process.
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+})
+
+class RateLimiter:
+    """Only throttles once Yahoo starts refusing requests, backing off exponentially"""
+
+    def __init__(self, initial_backoff: float = 2.0, max_backoff: float = 60.0):
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.backoff = 0.0
+
+    def acquire(self):
+        """Wait before the next request if we are currently backing off"""
+        if self.backoff:
+            print(f"Rate limited, waiting {self.backoff:.0f}s before the next request...")
+            time.sleep(self.backoff)
+
+    def on_response(self, rate_limited: bool):
+        """Double the wait after a refused request, relax it again after successes"""
+        if rate_limited:
+            self.backoff = min(max(self.backoff * 2, self.initial_backoff), self.max_backoff)
+        elif self.backoff > self.initial_backoff:
+            self.backoff /= 2
+        else:
+            self.backoff = 0.0
+
+# One limiter per process; each download worker throttles its own requests
+RATE_LIMITER = RateLimiter()
+
 def generate_cuid() -> str:
     """Generate a simple ID (not actual CUID but sufficient for our needs)"""
-    import uuid
-    return str(uuid.uuid4()).replace('-', '')
+    return os.urandom(16).hex()
 
 def get_all_crypto_symbols() -> List[Dict[str, str]]:
     """Scrape Yahoo Finance to get all available cryptocurrency symbols"""
@@ -33,34 +77,38 @@ def get_all_crypto_symbols() -> List[Dict[str, str]]:
 
         print(f"Fetching crypto data from: {url}")
 
-        # Use requests to get the page and pandas to parse tables
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        resp = requests.get(url, headers=headers, timeout=30)
+        # Use the shared session to get the page and lxml to read the crypto table
+        resp = HTTP_SESSION.get(url, timeout=30)
 
         if resp.status_code != 200:
             raise Exception(f"HTTP {resp.status_code}: Failed to fetch page")
 
-        # Parse the HTML tables using pandas
-        from io import StringIO
-        tables = pd.read_html(StringIO(resp.text))
-        df = tables[0].copy()
+        # Only the Symbol and Name cells of the first table are needed, so read
+        # them straight from the DOM instead of building a DataFrame
+        table = lxml.html.fromstring(resp.content).xpath('//table')[0]
+        columns = [th.text_content().strip() for th in table.xpath('.//thead//th')]
+        symbol_col = columns.index('Symbol')
+        name_col = columns.index('Name')
+        rows = table.xpath('.//tr[td]')
 
-        print(f"Found {len(df)} cryptocurrencies on Yahoo Finance")
+        print(f"Found {len(rows)} cryptocurrencies on Yahoo Finance")
 
         # Extract symbols and names
         crypto_list = []
-        for _, row in df.iterrows():
-            symbol = str(row['Symbol'])
-            name = str(row['Name'])
+        for row in rows:
+            cells = row.xpath('./td')
+            if len(cells) <= max(symbol_col, name_col):
+                continue
+
+            symbol = cells[symbol_col].text_content().strip()
+            name = cells[name_col].text_content().strip()
 
-            # Skip if name is NaN or invalid
-            if name in ['nan', 'None', ''] or pd.isna(row['Name']):
+            # Skip rows without a usable symbol or name
+            if not symbol or not name:
                 continue
 
-            # Clean up the name (remove extra characters)
-            clean_name = re.sub(r'\s*\([^)]*\)', '', name).strip()
+            # Clean up the name (drop the trailing "(...)" suffix)
+            clean_name = name.split(' (', 1)[0].strip()
 
             crypto_info = {
                 'symbol': symbol,
@@ -113,8 +161,8 @@ def get_all_crypto_symbols() -> List[Dict[str, str]]:
 def connect_to_database() -> sqlite3.Connection:
     """Connect to the SQLite database"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        return conn
+        # Autocommit mode; bulk inserts manage their own BEGIN/COMMIT
+        return open_db(DATABASE_PATH, isolation_level=None)
     except Exception as e:
         print(f"Error connecting to database: {e}")
         sys.exit(1)
@@ -123,6 +171,7 @@ def insert_cryptocurrency(conn: sqlite3.Connection, crypto_info: Dict) -> str:
     """Insert cryptocurrency info into database and return the ID"""
     cursor = conn.cursor()
     crypto_id = generate_cuid()
+    now_iso = datetime.now().isoformat()
 
     try:
         cursor.execute('''
@@ -133,8 +182,8 @@ def insert_cryptocurrency(conn: sqlite3.Connection, crypto_info: Dict) -> str:
             crypto_info['symbol'],
             crypto_info['name'],
             crypto_info['full_name'],
-            datetime.now().isoformat(),
-            datetime.now().isoformat()
+            now_iso,
+            now_iso
         ))
 
         # If insert was ignored (already exists), get the existing ID
@@ -152,63 +201,66 @@ def insert_cryptocurrency(conn: sqlite3.Connection, crypto_info: Dict) -> str:
         conn.rollback()
         return None
 
-def fetch_and_store_crypto_data(conn: sqlite3.Connection, crypto_info: Dict, crypto_id: str, period: str = "2y"):
-    """Fetch cryptocurrency data from yfinance and store in database"""
+def download_crypto_history(symbols: List[str], period: str = "2y") -> Dict[str, pd.DataFrame]:
+    """Download daily history for several symbols in one yfinance request"""
+    print(f"Downloading {period} of daily data for {len(symbols)} cryptocurrencies...")
 
-    print(f"Fetching data for {crypto_info['name']} ({crypto_info['symbol']})...")
+    for attempt in range(1, MAX_DOWNLOAD_RETRIES + 1):
+        RATE_LIMITER.acquire()
+        try:
+            histories = download_tickers(symbols, period=period, interval="1d")
+            # yfinance reports rate limiting by returning nothing for the whole chunk
+            error = None if histories else "empty response"
+        except Exception as e:
+            error = e
 
-    try:
-        # Fetch data from yfinance
-        ticker = yf.Ticker(crypto_info['symbol'])
-        hist = ticker.history(period=period, interval="1d")
+        RATE_LIMITER.on_response(rate_limited=error is not None)
+        if error is None:
+            break
+
+        if attempt == MAX_DOWNLOAD_RETRIES:
+            print(f"Error downloading data for {', '.join(symbols)}: {error}")
+            return {}
+
+        print(f"Download attempt {attempt} failed ({error}), retrying...")
+
+    return histories
+
+def fetch_chunk(chunk: List[Dict]):
+    """Download one chunk in a worker process and return its price tuples by symbol"""
+    history = download_crypto_history([crypto_info['symbol'] for crypto_info in chunk])
+    return chunk, {symbol: history_to_prices(hist) for symbol, hist in history.items()}
+
+def store_crypto_data(conn: sqlite3.Connection, crypto_info: Dict, crypto_id: str, prices: Optional[List[tuple]]):
+    """Store downloaded cryptocurrency prices in database"""
+
+    print(f"Storing data for {crypto_info['name']} ({crypto_info['symbol']})...")
 
-        if hist.empty:
+    try:
+        if not prices:
             print(f"No data available for {crypto_info['symbol']}")
             return False
 
-        # Reset index to get date as a column
-        hist = hist.reset_index()
-
         cursor = conn.cursor()
-        inserted_count = 0
-
-        # Insert price data
-        for _, row in hist.iterrows():
-            price_id = generate_cuid()
-            date = row['Date'].strftime('%Y-%m-%d %H:%M:%S')
-
-            # Market cap is not available from yfinance historical data
-            market_cap = None
-
-            try:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO CryptocurrencyPrice
-                    (id, cryptocurrencyId, date, open, high, low, close, volume, marketCap, createdAt)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    price_id,
-                    crypto_id,
-                    date,
-                    float(row['Open']),
-                    float(row['High']),
-                    float(row['Low']),
-                    float(row['Close']),
-                    float(row['Volume']),
-                    market_cap,
-                    datetime.now().isoformat()
-                ))
-                inserted_count += 1
-
-            except Exception as e:
-                print(f"Error inserting price data for {crypto_info['symbol']} on {date}: {e}")
-                continue
 
+        # Market cap is not available from yfinance historical data, so it stays NULL
+        ids = generate_price_data_ids(len(prices))
+        now_iso = datetime.now().isoformat()
+
+        # Streamed into the INSERT chunks without building a second list
+        rows = (
+            (price_id, crypto_id, date, open_, high, low, close, volume, None, now_iso)
+            for price_id, (date, open_, high, low, close, volume) in zip(ids, prices)
+        )
+
+        cursor.execute('BEGIN')
+        insert_price_rows(cursor, rows)
         conn.commit()
-        print(f"Successfully stored {inserted_count} days of data for {crypto_info['name']}")
+        print(f"Successfully stored {len(prices)} days of data for {crypto_info['name']}")
         return True
 
     except Exception as e:
-        print(f"Error fetching data for {crypto_info['symbol']}: {e}")
+        print(f"Error storing data for {crypto_info['symbol']}: {e}")
         conn.rollback()
         return False
 
@@ -233,31 +285,26 @@ def main():
     failed_fetches = 0
 
     try:
-        # Process each cryptocurrency
-        for i, crypto_info in enumerate(crypto_list, 1):
-            print(f"\n[{i}/{len(crypto_list)}] Processing {crypto_info['name']}...")
-
-            # Insert cryptocurrency info
-            crypto_id = insert_cryptocurrency(conn, crypto_info)
-            if not crypto_id:
-                print(f"Failed to insert {crypto_info['symbol']}, skipping...")
-                failed_fetches += 1
-                continue
-
-            # Fetch and store price data
-            success = fetch_and_store_crypto_data(conn, crypto_info, crypto_id)
-
-            if success:
-                successful_fetches += 1
-            else:
-                failed_fetches += 1
-
-            # Add small delay to be respectful to Yahoo Finance
-            if i % 10 == 0:  # Every 10 requests
-                print("Taking a short break to avoid rate limiting...")
-                time.sleep(2)
-            else:
-                time.sleep(0.5)
+        processed = 0
+        for chunk, prices_by_symbol in download_in_chunks(fetch_chunk, crypto_list, DOWNLOAD_CHUNK_SIZE, DOWNLOAD_WORKERS):
+            for crypto_info in chunk:
+                processed += 1
+                print(f"\n[{processed}/{len(crypto_list)}] Processing {crypto_info['name']}...")
+
+                # Insert cryptocurrency info
+                crypto_id = insert_cryptocurrency(conn, crypto_info)
+                if not crypto_id:
+                    print(f"Failed to insert {crypto_info['symbol']}, skipping...")
+                    failed_fetches += 1
+                    continue
+
+                # Store price data
+                success = store_crypto_data(conn, crypto_info, crypto_id, prices_by_symbol.get(crypto_info['symbol']))
+
+                if success:
+                    successful_fetches += 1
+                else:
+                    failed_fetches += 1
 
         print(f"\n=== SUMMARY ===")
         print(f"Successfully fetched: {successful_fetches} cryptocurrencies")
@@ -11,6 +11,9 @@ from datetime import datetime, timedelta
 import sys
 import os
 from typing import List, Dict, Optional
+from crypto_prices import insert_price_rows
+from yf_utils import history_to_prices
+from db_utils import generate_price_data_ids, open_db
 
 # Database configuration
 DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'prisma', 'dev.db')
@@ -41,14 +44,13 @@ CRYPTOCURRENCIES = [
 
 def generate_cuid() -> str:
     """Generate a simple ID (not actual CUID but sufficient for our needs)"""
-    import uuid
-    return str(uuid.uuid4()).replace('-', '')
+    return os.urandom(16).hex()
 
 def connect_to_database() -> sqlite3.Connection:
     """Connect to the SQLite database"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        return conn
+        # Autocommit mode; bulk inserts manage their own BEGIN/COMMIT
+        return open_db(DATABASE_PATH, isolation_level=None)
     except Exception as e:
         print(f"Error connecting to database: {e}")
         sys.exit(1)
@@ -57,6 +59,7 @@ def insert_cryptocurrency(conn: sqlite3.Connection, crypto_info: Dict) -> str:
     """Insert cryptocurrency info into database and return the ID"""
     cursor = conn.cursor()
     crypto_id = generate_cuid()
+    now_iso = datetime.now().isoformat()
 
     try:
         cursor.execute('''
@@ -67,8 +70,8 @@ def insert_cryptocurrency(conn: sqlite3.Connection, crypto_info: Dict) -> str:
             crypto_info['symbol'],
             crypto_info['name'],
             crypto_info['full_name'],
-            datetime.now().isoformat(),
-            datetime.now().isoformat()
+            now_iso,
+            now_iso
         ))
 
         # If insert was ignored (already exists), get the existing ID
@@ -100,45 +103,23 @@ def fetch_and_store_crypto_data(conn: sqlite3.Connection, crypto_info: Dict, cry
             print(f"No data available for {crypto_info['symbol']}")
             return
 
-        # Reset index to get date as a column
-        hist = hist.reset_index()
-
         cursor = conn.cursor()
 
-        # Insert price data
-        for _, row in hist.iterrows():
-            price_id = generate_cuid()
-            date = row['Date'].strftime('%Y-%m-%d %H:%M:%S')
-
-            # Calculate market cap (approximate using close price * volume)
-            # Note: This is not accurate market cap, just a placeholder
-            # Real market cap would need circulating supply data
-            market_cap = None  # We'll leave this as NULL for now
-
-            try:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO CryptocurrencyPrice
-                    (id, cryptocurrencyId, date, open, high, low, close, volume, marketCap, createdAt)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    price_id,
-                    crypto_id,
-                    date,
-                    float(row['Open']),
-                    float(row['High']),
-                    float(row['Low']),
-                    float(row['Close']),
-                    float(row['Volume']),
-                    market_cap,
-                    datetime.now().isoformat()
-                ))
-
-            except Exception as e:
-                print(f"Error inserting price data for {crypto_info['symbol']} on {date}: {e}")
-                continue
+        # Market cap is not available from yfinance historical data, so it stays NULL
+        prices = history_to_prices(hist)
+        ids = generate_price_data_ids(len(prices))
+        now_iso = datetime.now().isoformat()
+
+        # Streamed into the INSERT chunks without building a second list
+        rows = (
+            (price_id, crypto_id, date, open_, high, low, close, volume, None, now_iso)
+            for price_id, (date, open_, high, low, close, volume) in zip(ids, prices)
+        )
 
+        cursor.execute('BEGIN')
+        insert_price_rows(cursor, rows)
         conn.commit()
-        print(f"Successfully stored {len(hist)} days of data for {crypto_info['name']}")
+        print(f"Successfully stored {len(prices)} days of data for {crypto_info['name']}")
 
     except Exception as e:
         print(f"Error fetching data for {crypto_info['symbol']}: {e}")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Shared daily stock data fetcher used by the fetch_daily_* scripts
+Downloads recent daily data with yfinance and inserts the new rows into PriceData
+"""
+from datetime import datetime, timedelta
+from itertools import chain
+from db_utils import chunked, generate_price_data_ids, open_db
+from yf_utils import download_in_chunks, download_tickers, history_to_prices
+
+# Yahoo serves up to 20 tickers per download request
+DOWNLOAD_CHUNK_SIZE = 20
+
+# Worker processes downloading chunks in parallel
+DOWNLOAD_WORKERS = 8
+
+# Rows per multi-row INSERT; 3640 rows x 9 columns stays under the 32766
+# host parameter limit of SQLite 3.32+
+INSERT_CHUNK_ROWS = 32766 // 9
+
+# Multi-row insert statement; the (assetId, date) unique index makes SQLite
+# skip dates that already exist
+INSERT_SQL = """
+    INSERT OR IGNORE INTO PriceData (id, assetId, date, open, high, low, close, volume, createdAt)
+    VALUES {placeholders}
+"""
+
+def get_stock_symbols(db_path, limit=None):
+    """Get stock symbols from the database in alphabetical order, optionally only the first `limit`"""
+    conn = open_db(db_path)
+    try:
+        # LIMIT -1 means no limit in SQLite
+        cursor = conn.execute(
+            "SELECT symbol FROM Asset WHERE type = 'STOCK' ORDER BY symbol LIMIT ?",
+            (-1 if limit is None else limit,)
+        )
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+def get_stock_asset_ids(cursor):
+    """Get a symbol -> asset ID map for every stock in the database in one query"""
+    cursor.execute("SELECT symbol, id FROM Asset WHERE type = 'STOCK'")
+    return dict(cursor.fetchall())
+
+def download_daily_data(symbols, days_back=5):
+    """
+    Download recent daily data for several symbols in one yfinance request
+    Args:
+        symbols: Stock symbols (e.g., ['AAPL', 'MSFT'])
+        days_back: Number of days back to fetch (default 5 to ensure we get the latest trading day)
+    Returns a dict mapping each downloaded symbol to its history frame
+    """
+    try:
+        # Get data for the last few days to ensure we capture the latest trading day
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days_back)
+
+        return download_tickers(symbols, start=start_date, end=end_date, interval='1d')
+    except Exception as e:
+        print(f"  ERROR: Error downloading data for {', '.join(symbols)}: {str(e)}")
+        return {}
+
+def fetch_daily_data_for_symbol(symbol, histories):
+    """
+    Convert a symbol's downloaded daily history to data points
+    Args:
+        symbol: Stock symbol (e.g., 'AAPL')
+        histories: Dict of history frames returned by download_daily_data
+    """
+    try:
+        hist = histories.get(symbol)
+
+        if hist is None or hist.empty:
+            print(f"  WARNING: No data available for {symbol}")
+            return []
+
+        return history_to_prices(hist)
+
+    except Exception as e:
+        print(f"  ERROR: Error converting data for {symbol}: {str(e)}")
+        return []
+
+def fetch_chunk(chunk):
+    """Download one chunk in a worker process and return its data points by symbol"""
+    histories = download_daily_data(chunk)
+    return chunk, {symbol: fetch_daily_data_for_symbol(symbol, histories) for symbol in chunk}
+
+def fetch_all_daily_data(symbols, workers=DOWNLOAD_WORKERS, chunk=DOWNLOAD_CHUNK_SIZE):
+    """Yield (symbol, data_points) for every symbol as its chunk finishes downloading"""
+    for chunk_symbols, data_by_symbol in download_in_chunks(fetch_chunk, symbols, chunk, workers):
+        for symbol in chunk_symbols:
+            yield symbol, data_by_symbol[symbol]
+
+def insert_price_rows(cursor, rows):
+    """Insert price rows with one multi-row INSERT statement per chunk and return how many were new"""
+    inserted = 0
+    for chunk in chunked(rows, INSERT_CHUNK_ROWS):
+        placeholders = ', '.join(['(?, ?, ?, ?, ?, ?, ?, ?, ?)'] * len(chunk))
+        cursor.execute(INSERT_SQL.format(placeholders=placeholders), list(chain.from_iterable(chunk)))
+        inserted += cursor.rowcount
+    return inserted
+
+def update_daily_data(cursor, asset_id, data_points):
+    """Insert a symbol's data points in one transaction and return how many were new"""
+    timestamp = int(datetime.now().timestamp() * 1000)
+    price_ids = generate_price_data_ids(len(data_points), timestamp)
+    # Rows are streamed into the chunked inserts rather than staged in a list
+    params = (
+        (price_id, asset_id, *dp, timestamp)
+        for price_id, dp in zip(price_ids, data_points)
+    )
+
+    # The connection context manager commits the transaction, or rolls it back
+    # if the insert raises
+    cursor.execute("BEGIN IMMEDIATE")
+    with cursor.connection:
+        return insert_price_rows(cursor, params)
+
+def fetch_batch(symbols, db_path, workers=DOWNLOAD_WORKERS, chunk=DOWNLOAD_CHUNK_SIZE):
+    """
+    Fetch recent daily data for symbols and insert the new rows into the database
+    Args:
+        symbols: Stock symbols to update
+        db_path: Path to the SQLite database
+        workers: Worker processes downloading chunks in parallel
+        chunk: Symbols requested per yfinance download
+    Returns (successful_updates, failed_updates, total_inserted)
+    """
+    # Autocommit mode; every symbol is written in its own BEGIN IMMEDIATE transaction
+    conn = open_db(db_path, isolation_level=None)
+    cursor = conn.cursor()
+
+    total_inserted = 0
+    successful_updates = 0
+    failed_updates = 0
+
+    try:
+        asset_ids = get_stock_asset_ids(cursor)
+
+        # Process each symbol as its download chunk arrives
+        for i, (symbol, data_points) in enumerate(fetch_all_daily_data(symbols, workers, chunk), 1):
+            print(f"[{i}/{len(symbols)}] Processing {symbol}...")
+
+            asset_id = asset_ids.get(symbol)
+            if not asset_id:
+                print(f"  WARNING: Asset {symbol} not found in database")
+                failed_updates += 1
+                continue
+
+            if not data_points:
+                print(f"  WARNING: No data received")
+                failed_updates += 1
+                continue
+
+            try:
+                inserted = update_daily_data(cursor, asset_id, data_points)
+            except Exception as e:
+                print(f"  ERROR: Failed to process {symbol}: {str(e)}")
+                failed_updates += 1
+                continue
+
+            total_inserted += inserted
+            successful_updates += 1
+
+            if inserted > 0:
+                print(f"  SUCCESS: Added {inserted} new data points")
+            else:
+                print(f"  INFO: No new data to add")
+    finally:
+        conn.close()
+
+    # Summary
+    print("\n" + "="*60)
+    print("DAILY DATA FETCH SUMMARY")
+    print("="*60)
+    print(f"Total symbols processed: {len(symbols)}")
+    print(f"Successful updates: {successful_updates}")
+    print(f"Failed updates: {failed_updates}")
+    print(f"Total new data points added: {total_inserted}")
+    print("="*60)
+
+    return successful_updates, failed_updates, total_inserted
@@ -2,8 +2,8 @@
 """
 Simple test to fetch daily data for a few stocks
 """
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime
+from fetch_daily_core import download_daily_data
 
 def test_yfinance():
     """Test yfinance with a few popular stocks"""
@@ -12,19 +12,16 @@ def test_yfinance():
     print("Testing yfinance API with sample stocks...")
     print(f"Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
+    # Get data for the last 5 days for every symbol in one request
+    histories = download_daily_data(symbols, days_back=5)
+
     for symbol in symbols:
         print(f"\nFetching data for {symbol}...")
 
         try:
-            ticker = yf.Ticker(symbol)
-
-            # Get data for the last 5 days to ensure we capture the latest trading day
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=5)
-
-            hist = ticker.history(start=start_date, end=end_date, interval='1d')
+            hist = histories.get(symbol)
 
-            if hist.empty:
+            if hist is None or hist.empty:
                 print(f"  No data available for {symbol}")
                 continue
 
@@ -2,8 +2,8 @@
 """
 Show current daily data for stocks (without database operations)
 """
-import yfinance as yf
-from datetime import datetime, timedelta
+from datetime import datetime
+from fetch_daily_core import download_daily_data
 
 # Main stocks to check
 STOCKS = ['AAPL', 'MSFT', 'GOOGL', 'TSLA', 'SPY', 'BTC-USD', 'ETH-USD']
@@ -14,18 +14,19 @@ def show_current_data():
     print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
 
+    # Get last 2 days for every symbol in one concurrent download
+    histories = download_daily_data(STOCKS, days_back=2)
+
     for symbol in STOCKS:
         print(f"\n{symbol}:")
         try:
-            ticker = yf.Ticker(symbol)
-
-            # Get last 2 days to ensure we have the latest
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=2)
+            hist = histories.get(symbol)
 
-            hist = ticker.history(start=start_date, end=end_date, interval='1d')
+            # Stocks get empty rows on the weekend dates the cryptos trade on
+            if hist is not None:
+                hist = hist.dropna(subset=['Close'])
 
-            if hist.empty:
+            if hist is None or hist.empty:
                 print("  No data available")
                 continue
 
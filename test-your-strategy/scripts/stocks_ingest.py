@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Shared stock CSV ingest helpers used by the import_* scripts
+Reads the per-symbol CSVs from public/stocks and bulk-inserts them into PriceData
+"""
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import os
+import multiprocessing as mp
+from datetime import datetime
+from itertools import repeat
+import random
+import string
+from db_utils import generate_price_data_ids, open_db
+
+# Prisma database, relative to the project root the script runs from
+DATABASE_PATH = 'prisma/dev.db'
+
+# Worker processes parsing and importing CSV files in parallel
+IMPORT_WORKERS = max((os.cpu_count() or 2) - 1, 1)
+
+# CSV files handed to a worker at a time
+IMPORT_CHUNKSIZE = 8
+
+# Only the OHLCV columns are parsed from each stock CSV
+CSV_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+# Prepared once per worker connection and reused from the statement cache
+# for every file that worker imports; the (assetId, date) unique index makes
+# SQLite skip dates already stored
+INSERT_SQL = """
+    INSERT OR IGNORE INTO PriceData (id, assetId, date, open, high, low, close, volume, createdAt)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# 256 MiB page cache for the bulk imports, which touch every PriceData index page
+IMPORT_CACHE_SIZE = -262144
+
+# Symbol -> asset ID cache for this process, seeded from the Asset table by init_worker
+ASSET_IDS = {}
+
+# Worker process's database connection, opened once by init_worker and shared
+# by every file the worker imports; it is released when the worker exits
+CONNECTION = None
+
+def open_connection():
+    """Open the database in autocommit mode (each file manages its own transaction)"""
+    return open_db(DATABASE_PATH, isolation_level=None, cache_size=IMPORT_CACHE_SIZE)
+
+def load_asset_ids():
+    """Get a symbol -> asset ID map for every asset in the database in one query"""
+    # Assets are loaded once per run; the map tells the scripts which symbols
+    # are already imported and seeds the workers' asset caches
+    conn = open_connection()
+    try:
+        return dict(conn.execute("SELECT symbol, id FROM Asset").fetchall())
+    finally:
+        conn.close()
+
+def init_worker(asset_ids):
+    """Open a worker process's connection and seed its asset cache with the map loaded by the parent"""
+    global CONNECTION
+    CONNECTION = open_connection()
+    ASSET_IDS.update(asset_ids)
+
+def get_or_create_asset(cursor, symbol, asset_ids):
+    """Get asset ID from the cache or create new asset if it doesn't exist"""
+    if symbol in asset_ids:
+        return asset_ids[symbol]
+
+    # Generate a CUID-like ID for the asset (similar to Prisma's format)
+    timestamp = int(datetime.now().timestamp() * 1000)
+    random_part = ''.join(random.choices(string.ascii_lowercase + string.digits, k=10))
+    asset_id = f"cmfuz{random_part}{timestamp}"
+
+    # The unique index on Asset.symbol turns this into a no-op if another
+    # process created the asset after the cache was loaded
+    cursor.execute("""
+        INSERT OR IGNORE INTO Asset (id, symbol, name, type, exchange, createdAt, updatedAt)
+        VALUES (?, ?, ?, 'STOCK', 'NASDAQ', ?, ?)
+    """, (asset_id, symbol, symbol, timestamp, timestamp))
+
+    if cursor.rowcount == 0:
+        cursor.execute("SELECT id FROM Asset WHERE symbol = ?", (symbol,))
+        asset_id = cursor.fetchone()[0]
+
+    asset_ids[symbol] = asset_id
+    return asset_id
+
+# Date is typed inside the PyArrow reader; a pandas dtype is only applied after
+# PyArrow has already inferred a timestamp and shifted offset dates to UTC
+CSV_CONVERT_OPTIONS = pa_csv.ConvertOptions(
+    include_columns=CSV_COLUMNS,
+    column_types={'Date': pa.string()}
+)
+
+def read_price_csv(csv_path):
+    """Read a stock CSV into a frame whose Date column is in the stored text format"""
+    # Read CSV with the multithreaded PyArrow parser
+    df = pa_csv.read_csv(csv_path, convert_options=CSV_CONVERT_OPTIONS).to_pandas()
+
+    # Daily bars only need the local YYYY-MM-DD prefix, so the stored
+    # 'YYYY-MM-DD HH:MM:SS' text is built without parsing the dates
+    df['Date'] = df['Date'].str.slice(0, 10) + ' 00:00:00'
+
+    # volume is NOT NULL; a blank cell would abort the whole file's insert
+    df['Volume'] = df['Volume'].fillna(0)
+    return df
+
+def insert_price_data(cursor, df, asset_id):
+    """Insert a frame read by read_price_csv for an asset and return how many rows were new"""
+    timestamp = int(datetime.now().timestamp() * 1000)
+    price_ids = generate_price_data_ids(len(df), timestamp)
+
+    # Columns stay separate lists of Python scalars and are only zipped into
+    # row tuples as executemany consumes them; the constant assetId and
+    # createdAt are repeated rather than stored per row
+    rows = zip(
+        price_ids,
+        repeat(asset_id),
+        df['Date'].tolist(),
+        df['Open'].tolist(),
+        df['High'].tolist(),
+        df['Low'].tolist(),
+        df['Close'].tolist(),
+        df['Volume'].tolist(),
+        repeat(timestamp)
+    )
+
+    # Insert all records with one prepared statement; parameters are bound
+    # per row, so the multi-row VALUES variable limit does not apply
+    cursor.executemany(INSERT_SQL, rows)
+    return cursor.rowcount
+
+def import_csv_file(csv_path, cursor):
+    """Import a single CSV file in one transaction and return how many rows were new, or None on error"""
+    # Extract symbol from filename
+    symbol = os.path.basename(csv_path).replace('.csv', '')
+    try:
+        print(f"Processing {symbol}...")
+
+        # Parse before the write lock is taken so other workers can insert meanwhile
+        df = read_price_csv(csv_path)
+
+        # The whole file (asset row and prices) is written in one transaction
+        # that the connection context manager commits, or rolls back if
+        # anything raises
+        cursor.execute("BEGIN IMMEDIATE")
+        with cursor.connection:
+            # Get or create asset
+            asset_id = get_or_create_asset(cursor, symbol, ASSET_IDS)
+
+            if len(df) == 0:
+                print(f"  {symbol}: No records to import")
+                return 0
+
+            imported = insert_price_data(cursor, df, asset_id)
+
+        print(f"  {symbol}: Imported {imported} records")
+        return imported
+
+    except Exception as e:
+        print(f"  ERROR importing {symbol}: {str(e)}")
+        return None
+
+def import_csv_worker(csv_path):
+    """Import one CSV file in a worker process over the worker's connection"""
+    return csv_path, import_csv_file(csv_path, CONNECTION.cursor())
+
+def import_csv_files(csv_files, asset_ids):
+    """Import CSV files in parallel and return (records imported, successful files, failed files)"""
+    total_imported = 0
+    successful_files = 0
+    failed_files = 0
+
+    # Files are parsed in parallel worker processes; each file is written
+    # in its own transaction and busy_timeout queues the competing writers
+    with mp.Pool(IMPORT_WORKERS, initializer=init_worker, initargs=(asset_ids,)) as pool:
+        results = pool.imap_unordered(import_csv_worker, csv_files, chunksize=IMPORT_CHUNKSIZE)
+        for i, (csv_file, imported) in enumerate(results, 1):
+            print(f"[{i}/{len(csv_files)}] Finished {os.path.basename(csv_file)}")
+            if imported is None:
+                failed_files += 1
+            else:
+                total_imported += imported
+                successful_files += 1
+
+    return total_imported, successful_files, failed_files
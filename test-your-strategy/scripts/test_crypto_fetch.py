@@ -7,8 +7,12 @@ import yfinance as yf
 import sqlite3
 import pandas as pd
 from datetime import datetime
+import itertools
+import secrets
 import sys
 import os
+from yf_utils import history_to_prices
+from db_utils import open_db
 
 # Database configuration
 DATABASE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'prisma', 'dev.db')
@@ -20,15 +24,19 @@ TEST_CRYPTOS = [
     {'symbol': 'BNB-USD', 'name': 'BNB', 'full_name': 'BNB USD'},
 ]
 
+# IDs are a random prefix drawn once per run plus a process-wide counter
+ID_PREFIX = secrets.token_hex(5)
+ID_COUNTER = itertools.count()
+
 def generate_cuid() -> str:
     """Generate a simple ID"""
-    import uuid
-    return str(uuid.uuid4()).replace('-', '')
+    return f"c{ID_PREFIX}{next(ID_COUNTER):013x}"
 
 def test_crypto_fetch():
     """Test fetching a few cryptocurrencies"""
     print(f"Testing cryptocurrency fetch with database at: {DATABASE_PATH}")
 
+    conn = None
     try:
         # Add timeout and retry logic for database connection
         import time
@@ -37,7 +45,7 @@ def test_crypto_fetch():
 
         while retry_count < max_retries:
             try:
-                conn = sqlite3.connect(DATABASE_PATH, timeout=30.0)
+                conn = open_db(DATABASE_PATH, cache_size=-262144)
                 conn.execute('BEGIN IMMEDIATE;')
                 conn.rollback()
                 break
@@ -54,64 +62,55 @@ def test_crypto_fetch():
         for crypto in TEST_CRYPTOS:
             print(f"\nTesting {crypto['name']} ({crypto['symbol']})...")
 
-            # Insert cryptocurrency
-            crypto_id = generate_cuid()
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT OR IGNORE INTO Cryptocurrency (id, symbol, name, fullName, createdAt, updatedAt)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                crypto_id,
-                crypto['symbol'],
-                crypto['name'],
-                crypto['full_name'],
-                datetime.now().isoformat(),
-                datetime.now().isoformat()
-            ))
-
-            if cursor.rowcount == 0:
-                cursor.execute('SELECT id FROM Cryptocurrency WHERE symbol = ?', (crypto['symbol'],))
-                result = cursor.fetchone()
-                if result:
-                    crypto_id = result[0]
-
-            # Fetch yfinance data
+            # Fetch yfinance data before any write so no lock is held during the request
             ticker = yf.Ticker(crypto['symbol'])
             hist = ticker.history(period="5d", interval="1d")  # Just 5 days for testing
 
-            if not hist.empty:
+            # Each symbol is written in its own short transaction; the connection
+            # context manager commits it, or rolls it back if an insert raises
+            with conn:
+                # Insert cryptocurrency
+                crypto_id = generate_cuid()
+                cursor = conn.cursor()
+
+                cursor.execute('''
+                    INSERT OR IGNORE INTO Cryptocurrency (id, symbol, name, fullName, createdAt, updatedAt)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (
+                    crypto_id,
+                    crypto['symbol'],
+                    crypto['name'],
+                    crypto['full_name'],
+                    datetime.now().isoformat(),
+                    datetime.now().isoformat()
+                ))
+
+                if cursor.rowcount == 0:
+                    cursor.execute('SELECT id FROM Cryptocurrency WHERE symbol = ?', (crypto['symbol'],))
+                    result = cursor.fetchone()
+                    if result:
+                        crypto_id = result[0]
+
+                if hist.empty:
+                    print(f"  No data available")
+                    continue
+
                 print(f"  Fetched {len(hist)} days of data")
 
-                # Insert a few data points
-                hist = hist.reset_index()
-                count = 0
-
-                for _, row in hist.iterrows():
-                    price_id = generate_cuid()
-                    date = row['Date'].strftime('%Y-%m-%d %H:%M:%S')
-
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO CryptocurrencyPrice
-                        (id, cryptocurrencyId, date, open, high, low, close, volume, createdAt)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        price_id,
-                        crypto_id,
-                        date,
-                        float(row['Open']),
-                        float(row['High']),
-                        float(row['Low']),
-                        float(row['Close']),
-                        float(row['Volume']),
-                        datetime.now().isoformat()
-                    ))
-                    count += 1
-
-                conn.commit()
-                print(f"  Successfully stored {count} price records")
-            else:
-                print(f"  No data available")
+                # Insert the data points with one prepared statement
+                created_at = datetime.now().isoformat()
+                rows = [
+                    (generate_cuid(), crypto_id, date, open_, high, low, close, volume, created_at)
+                    for date, open_, high, low, close, volume in history_to_prices(hist)
+                ]
+
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO CryptocurrencyPrice
+                    (id, cryptocurrencyId, date, open, high, low, close, volume, createdAt)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+
+            print(f"  Successfully stored {len(rows)} price records")
 
         print(f"\nTest completed successfully!")
 
@@ -124,12 +123,13 @@ def test_crypto_fetch():
 
         print(f"Database now contains: {crypto_count} cryptocurrencies, {price_count} price records")
 
-        conn.close()
-
     except Exception as e:
         print(f"Error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if conn is not None:
+            conn.close()
 
 if __name__ == "__main__":
     test_crypto_fetch()
\ No newline at end of file
@@ -3,7 +3,6 @@
 Test script to scrape cryptocurrency symbols from Yahoo Finance
 """
 
-import pandas as pd
 import requests
 import re
 from typing import List, Dict
@@ -15,7 +14,8 @@ def test_scrape_crypto_symbols() -> List[Dict[str, str]]:
     try:
         # Start with smaller number for testing
         num_currencies = 500
-        url = f"https://finance.yahoo.com/crypto?offset=0&count={num_currencies}"
+        url = "https://query1.finance.yahoo.com/v1/finance/screener/predefined/saved"
+        params = {'scrIds': 'all_cryptocurrencies_us', 'count': num_currencies}
 
         print(f"Fetching from: {url}")
 
@@ -23,51 +23,38 @@ def test_scrape_crypto_symbols() -> List[Dict[str, str]]:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
 
-        resp = requests.get(url, headers=headers, timeout=15)
+        resp = requests.get(url, params=params, headers=headers, timeout=15)
         print(f"HTTP Status: {resp.status_code}")
 
         if resp.status_code != 200:
             raise Exception(f"HTTP {resp.status_code}")
 
-        # Try to parse tables from the response
-        from io import StringIO
-        tables = pd.read_html(StringIO(resp.text))
-
-        print(f"Found {len(tables)} tables")
-
-        # Get the first table which should contain crypto data
-        df = tables[0].copy()
-        print(f"Table has {len(df)} rows and columns: {list(df.columns)}")
+        # The screener API returns the crypto table as JSON quotes, so no HTML parsing is needed
+        result = resp.json()['finance']['result']
+        if not result:
+            print("No screener result in the response")
+            return []
 
-        # Show first few rows
-        print("\nFirst 5 rows:")
-        print(df.head())
+        quotes = result[0]['quotes']
+        print(f"Found {len(quotes)} quotes")
 
-        # Extract symbols and names if columns exist
-        if 'Symbol' in df.columns and 'Name' in df.columns:
-            crypto_list = []
-            for _, row in df.iterrows():
-                symbol = row['Symbol']
-                name = row['Name']
+        crypto_list = []
+        for quote in quotes:
+            name = quote.get('shortName') or quote['symbol']
 
+            crypto_info = {
+                'symbol': quote['symbol'],
                 # Clean up the name
-                clean_name = re.sub(r'\s*\([^)]*\)', '', str(name)).strip()
+                'name': re.sub(r'\s*\([^)]*\)', '', name).strip(),
+                'full_name': quote.get('longName') or name
+            }
+            crypto_list.append(crypto_info)
 
-                crypto_info = {
-                    'symbol': symbol,
-                    'name': clean_name,
-                    'full_name': str(name)
-                }
-                crypto_list.append(crypto_info)
+        print(f"\nExtracted {len(crypto_list)} cryptocurrencies:")
+        for i, crypto in enumerate(crypto_list[:10]):
+            print(f"  {i+1}. {crypto['name']} ({crypto['symbol']})")
 
-            print(f"\nExtracted {len(crypto_list)} cryptocurrencies:")
-            for i, crypto in enumerate(crypto_list[:10]):
-                print(f"  {i+1}. {crypto['name']} ({crypto['symbol']})")
-
-            return crypto_list
-        else:
-            print("Could not find Symbol and Name columns")
-            return []
+        return crypto_list
 
     except Exception as e:
         print(f"Error during scraping: {e}")
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Test that stock CSV dates are stored by their local calendar date
+"""
+import os
+import tempfile
+from stocks_ingest import read_price_csv
+
+def test_read_price_csv_keeps_offset_dates():
+    """Offset-bearing dates keep their own day and blank volumes become 0"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'TEST.csv')
+        with open(csv_path, 'w') as f:
+            f.write("Date,Open,High,Low,Close,Adj Close,Volume\n")
+            f.write("2024-01-02 00:00:00+05:30,1.0,2.0,0.5,1.5,1.5,100\n")
+            f.write("2024-01-03 00:00:00-05:00,1.0,2.0,0.5,1.5,1.5,\n")
+            f.write("2024-01-04,1.0,2.0,0.5,1.5,1.5,300\n")
+
+        df = read_price_csv(csv_path)
+
+    assert df['Date'].tolist() == ['2024-01-02 00:00:00', '2024-01-03 00:00:00', '2024-01-04 00:00:00']
+    assert df['Volume'].tolist() == [100, 0, 300]
+
+if __name__ == "__main__":
+    test_read_price_csv_keeps_offset_dates()
+    print("read_price_csv test passed")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Shared yfinance download helpers for the fetch scripts
+"""
+import yfinance as yf
+import pandas as pd
+import multiprocessing as mp
+from db_utils import chunked
+
+def download_in_chunks(fetch_chunk, items, chunk_size, workers):
+    """Run fetch_chunk over successive chunks of items and yield each result as its chunk finishes"""
+    chunks = list(chunked(items, chunk_size))
+
+    # Chunks download in parallel worker processes (each with its own
+    # yfinance state) and come back as plain Python objects, so SQLite is
+    # only ever written from the calling process
+    with mp.Pool(min(workers, len(chunks)) or 1) as pool:
+        yield from pool.imap_unordered(fetch_chunk, chunks)
+
+def download_tickers(symbols, **params):
+    """Download several symbols in one yfinance request and return each downloaded symbol's history frame"""
+    data = yf.download(
+        ' '.join(symbols),
+        group_by='ticker',
+        auto_adjust=True,
+        threads=True,
+        progress=False,
+        **params
+    )
+    if data.empty:
+        return {}
+
+    # Older yfinance releases return flat columns when only one ticker is requested
+    if not isinstance(data.columns, pd.MultiIndex):
+        return {symbols[0]: data}
+
+    downloaded = set(data.columns.get_level_values(0))
+    return {symbol: data[symbol] for symbol in symbols if symbol in downloaded}
+
+def history_to_prices(hist):
+    """Convert a downloaded history frame to (date, open, high, low, close, volume) tuples"""
+    # Drop incomplete rows once and let itertuples build the tuples in C
+    # instead of boxing every row into a Series; dates are formatted in one
+    # vectorized pass straight off the DatetimeIndex
+    hist = hist.dropna(subset=['Open', 'High', 'Low', 'Close'])
+    prices = hist[['Open', 'High', 'Low', 'Close', 'Volume']].astype('float64')
+
+    # volume is NOT NULL, and yfinance leaves it NaN on days it has no volume
+    # for; one NULL would abort the symbol's whole insert
+    prices['Volume'] = prices['Volume'].fillna(0)
+
+    prices.insert(0, 'Date', hist.index.strftime('%Y-%m-%d %H:%M:%S'))
+    return list(prices.itertuples(index=False, name=None))